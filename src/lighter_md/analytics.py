@@ -8,7 +8,10 @@ import math
 import time
 from contextlib import suppress
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Sequence
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import orjson
 
 from .bus import funding_bus
 from .config import settings
@@ -23,40 +26,66 @@ def compute_cross_sectional_zscores(
     *,
     min_assets_per_time: int = 3,
     ddof: int = 0,
-) -> Dict[int, Optional[float]]:
-    """Return z-scores keyed by market id for the provided market rows."""
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return market ids and aligned z-scores (``nan`` where unavailable) for ``rows``."""
 
-    funding_values: List[tuple[int, float]] = []
+    ids: List[int] = []
+    funding_values: List[float] = []
     for row in rows:
-        if row.funding_rate is None:
-            continue
-        funding_values.append((row.market_id, row.funding_rate))
+        ids.append(row.market_id)
+        funding_values.append(math.nan if row.funding_rate is None else row.funding_rate)
 
-    count = len(funding_values)
-    if count < min_assets_per_time:
-        return {row.market_id: None for row in rows}
+    market_ids = np.asarray(ids, dtype=np.int64)
+    funding = np.ascontiguousarray(funding_values, dtype=np.float64)
+    zscores = np.full(len(ids), np.nan)
 
-    mean = sum(val for _, val in funding_values) / count
-    variance_sum = sum((val - mean) ** 2 for _, val in funding_values)
+    present = ~np.isnan(funding)
+    count = int(present.sum())
+    if count < min_assets_per_time:
+        return market_ids, zscores
 
+    vals = funding[present]
+    # Centre once and reuse the buffer for both the variance and the z-scores;
+    # squaring deviations (not raw values) keeps tiny funding rates stable.
+    centered = vals - vals.mean()
     divisor = max(count - ddof, 1)
-    std = math.sqrt(variance_sum / divisor)
+    std = float(np.sqrt(np.dot(centered, centered) / divisor))
     if std <= 0.0:
-        return {row.market_id: None for row in rows}
+        return market_ids, zscores
 
-    zscores: Dict[int, Optional[float]] = {}
-    for row in rows:
-        if row.funding_rate is None:
-            zscores[row.market_id] = None
-        else:
-            zscores[row.market_id] = (row.funding_rate - mean) / std
-    return zscores
+    zscores[present] = centered / std
+    return market_ids, zscores
+
+
+def _ranked_order(
+    market_ids: np.ndarray,
+    z_key: np.ndarray,
+    oi_key: np.ndarray,
+    top_n: Optional[int] = None,
+) -> np.ndarray:
+    """Return row indices sorted by (z_key, oi_key, market_id), truncated to ``top_n``."""
+
+    if top_n is None or top_n >= len(z_key):
+        return np.lexsort((market_ids, oi_key, z_key))
+    # Partition on the primary key, keeping every row tied with the cut-off so
+    # the secondary keys still decide which of them make the list.
+    cutoff = np.partition(z_key, top_n - 1)[top_n - 1]
+    candidates = np.flatnonzero(z_key <= cutoff)
+    order = np.lexsort((market_ids[candidates], oi_key[candidates], z_key[candidates]))
+    return candidates[order[:top_n]]
 
 
 @dataclass
 class FundingSnapshot:
     timestamp_ms: int
     rows: List[dict]
+    payload: bytes = b""
+
+    def __post_init__(self) -> None:
+        if not self.payload:
+            self.payload = orjson.dumps(
+                {"type": "snapshot", "timestamp": self.timestamp_ms, "rows": self.rows}
+            )
 
 
 class FundingAnalytics:
@@ -69,11 +98,13 @@ class FundingAnalytics:
         publish_bus=funding_bus,
         interval_seconds: float = settings.funding_refresh_seconds,
         min_assets: int = settings.funding_min_assets,
+        top_n: Optional[int] = settings.funding_top_n or None,
     ) -> None:
         self._store = store
         self._bus = publish_bus
         self._interval = interval_seconds
         self._min_assets = min_assets
+        self._top_n = top_n if top_n and top_n > 0 else None
         self._stop_event = asyncio.Event()
         self._task: Optional[asyncio.Task] = None
         self._latest: Optional[FundingSnapshot] = None
@@ -112,38 +143,39 @@ class FundingAnalytics:
         if not rows:
             snapshot = FundingSnapshot(timestamp_ms=int(time.time() * 1000), rows=[])
             self._latest = snapshot
-            await self._bus.publish({"type": "snapshot", "timestamp": snapshot.timestamp_ms, "rows": []})
+            self._bus.publish(snapshot.payload)
             return
 
-        zscores = compute_cross_sectional_zscores(
+        market_ids, zscores = compute_cross_sectional_zscores(
             rows, min_assets_per_time=self._min_assets, ddof=0
         )
         now_ms = int(time.time() * 1000)
 
-        def sort_key(row: MarketRow) -> tuple:
-            z = zscores.get(row.market_id)
-            z_key = float("inf") if z is None else -z
-            oi = row.open_interest or 0.0
-            return (z_key, -oi, row.market_id)
-
-        ordered_rows = sorted(rows, key=sort_key)
+        # Highest z-score first (missing last), then open interest, then market id.
+        z_key = np.where(np.isnan(zscores), np.inf, -zscores)
+        oi_key = np.fromiter(
+            (-(row.open_interest or 0.0) for row in rows), dtype=np.float64, count=len(rows)
+        )
+        order = _ranked_order(market_ids, z_key, oi_key, self._top_n)
 
+        z_values = zscores.tolist()
         payload_rows: List[dict] = []
-        for row in ordered_rows:
-            wire = row.for_wire()
+        for idx in order.tolist():
+            row = rows[idx]
+            z = z_values[idx]
             payload_rows.append(
                 {
                     "market_id": row.market_id,
-                    "symbol": wire["symbol"],
+                    "symbol": row.display_symbol,
                     "funding_rate": row.funding_rate,
                     "open_interest": row.open_interest,
-                    "zscore": zscores.get(row.market_id),
+                    "zscore": None if math.isnan(z) else z,
                 }
             )
 
         snapshot = FundingSnapshot(timestamp_ms=now_ms, rows=payload_rows)
         self._latest = snapshot
-        await self._bus.publish({"type": "snapshot", "timestamp": now_ms, "rows": payload_rows})
+        self._bus.publish(snapshot.payload)
 
 
 __all__ = ["FundingAnalytics", "FundingSnapshot", "compute_cross_sectional_zscores"]
@@ -4,7 +4,9 @@ from __future__ import annotations
 
 import asyncio
 from contextlib import suppress
-from typing import AsyncIterator, Iterable, Mapping, Set
+from typing import AsyncIterator, Mapping, Optional, Tuple, Union
+
+import orjson
 
 from .config import settings
 
@@ -17,46 +19,53 @@ class UpdateBus:
     """In-process pub/sub that keeps only the most recent update per subscriber."""
 
     def __init__(self) -> None:
-        self._subscribers: Set[asyncio.Queue] = set()
+        # Copy-on-write: publish reads the tuple without locking; only
+        # subscribe/unsubscribe replace it.
+        self._subscribers: Tuple[asyncio.Queue, ...] = ()
         self._lock = asyncio.Lock()
 
-    async def publish(self, payload: Mapping[str, object]) -> None:
-        message = dict(payload)
-        async with self._lock:
-            subscribers: Iterable[asyncio.Queue] = list(self._subscribers)
-        for queue in subscribers:
-            # Always deliver the most recent event; drop stale ones if the queue is full.
-            with suppress(asyncio.QueueFull):
-                queue.put_nowait(message)
-                continue
-            try:
-                queue.get_nowait()
-            except asyncio.QueueEmpty:
-                pass
-            with suppress(asyncio.QueueFull):
-                queue.put_nowait(message)
+    def publish(self, payload: Union[Mapping[str, object], bytes]) -> None:
+        # Serialise once (or take pre-encoded bytes as-is); every subscriber
+        # gets the same immutable bytes, so nothing needs a defensive copy.
+        message = payload if isinstance(payload, bytes) else orjson.dumps(payload)
+        for queue in self._subscribers:
+            self._offer(queue, message)
 
-    async def subscribe(self) -> AsyncIterator[dict]:
+    async def subscribe(self) -> AsyncIterator[bytes]:
         queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
         async with self._lock:
-            self._subscribers.add(queue)
+            self._subscribers = self._subscribers + (queue,)
         try:
             while True:
                 item = await queue.get()
+                if item is None:
+                    return
                 yield item
         except asyncio.CancelledError:
             raise
         finally:
             async with self._lock:
-                self._subscribers.discard(queue)
+                self._subscribers = tuple(q for q in self._subscribers if q is not queue)
 
     async def close(self) -> None:
         async with self._lock:
-            subscribers = list(self._subscribers)
-            self._subscribers.clear()
+            subscribers = self._subscribers
+            self._subscribers = ()
         for queue in subscribers:
-            with suppress(asyncio.QueueFull):
-                queue.put_nowait({"type": "closed"})
+            self._offer(queue, None)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, item: Optional[bytes]) -> None:
+        # Always deliver the most recent event; drop stale ones if the queue is full.
+        with suppress(asyncio.QueueFull):
+            queue.put_nowait(item)
+            return
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        with suppress(asyncio.QueueFull):
+            queue.put_nowait(item)
 
 
 bus = UpdateBus()
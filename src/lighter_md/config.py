@@ -39,6 +39,10 @@ class Settings:
     ping_interval: float = _float_env("LIGHTER_WS_PING_INTERVAL", 20.0)
     reconnect_base_delay: float = _float_env("LIGHTER_WS_RECONNECT_BASE", 0.5)
     reconnect_max_delay: float = _float_env("LIGHTER_WS_RECONNECT_MAX", 30.0)
+    ws_batch_count: int = _int_env("LIGHTER_WS_BATCH_COUNT", 64)
+    ws_batch_period: float = _float_env("LIGHTER_WS_BATCH_PERIOD", 0.0005)
+    # permessage-deflate is off unless set (e.g. "deflate"); inflating every frame costs more CPU than it saves.
+    ws_compression: Optional[str] = os.environ.get("LIGHTER_WS_COMPRESSION") or None
     ui_debounce_seconds: float = _float_env("LIGHTER_UI_DEBOUNCE", 0.2)
     dashboard_host: str = os.environ.get("LIGHTER_DASHBOARD_HOST", "0.0.0.0")
     dashboard_port: int = _int_env("LIGHTER_DASHBOARD_PORT", 8000)
@@ -48,6 +52,7 @@ class Settings:
     log_level: str = os.environ.get("LIGHTER_LOG_LEVEL", "INFO")
     funding_refresh_seconds: float = _float_env("LIGHTER_FUNDING_REFRESH_SECONDS", 60.0)
     funding_min_assets: int = _int_env("LIGHTER_FUNDING_MIN_ASSETS", 3)
+    funding_top_n: int = _int_env("LIGHTER_FUNDING_TOP_N", 0)
 
 
 settings = Settings()
@@ -8,6 +8,7 @@ from contextlib import asynccontextmanager, suppress
 from pathlib import Path
 from typing import Any, AsyncIterator
 
+import orjson
 import uvicorn
 from fastapi import APIRouter, FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse, JSONResponse
@@ -79,19 +80,21 @@ async def health(request: Request) -> JSONResponse:
     return JSONResponse({"status": status, "markets": len(market_ids)})
 
 
+async def _send_json(websocket: WebSocket, payload: Any) -> None:
+    await websocket.send_bytes(orjson.dumps(payload))
+
+
 @router.websocket("/ws")
 async def websocket_updates(websocket: WebSocket) -> None:
     await websocket.accept()
     manager: WebSocketManager = websocket.app.state.manager
     snapshot = await manager.store.snapshot()
-    await websocket.send_json({"type": "snapshot", "rows": snapshot})
+    await _send_json(websocket, {"type": "snapshot", "rows": snapshot})
 
     updates = bus.subscribe()
     try:
         async for update in updates:
-            if update.get("type") == "closed":
-                break
-            await websocket.send_json({"type": "update", "row": update})
+            await websocket.send_bytes(update)
     except WebSocketDisconnect:
         pass
     finally:
@@ -106,16 +109,12 @@ async def websocket_funding(websocket: WebSocket) -> None:
     analytics: FundingAnalytics = websocket.app.state.analytics
     latest = analytics.latest
     if latest:
-        await websocket.send_json(
-            {"type": "snapshot", "timestamp": latest.timestamp_ms, "rows": latest.rows}
-        )
+        await websocket.send_bytes(latest.payload)
 
     updates = funding_bus.subscribe()
     try:
         async for update in updates:
-            if update.get("type") == "closed":
-                break
-            await websocket.send_json(update)
+            await websocket.send_bytes(update)
     except WebSocketDisconnect:
         pass
     finally:
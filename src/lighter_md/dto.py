@@ -2,16 +2,21 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Literal, Optional, Union
+from typing import Annotated, Any, Dict, Literal, Mapping, NamedTuple, Optional, Union
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator, model_validator
 
 
 def _coerce_float(value: Any) -> Optional[float]:
     if value is None:
         return None
-    if isinstance(value, (int, float)):
+    # Fast path: float() parses numeric strings, ints and floats natively, which
+    # covers nearly every value on the feed.
+    try:
         return float(value)
+    except (TypeError, ValueError):
+        pass
     if isinstance(value, str):
         value = value.strip()
         if not value:
@@ -23,26 +28,56 @@ def _coerce_float(value: Any) -> Optional[float]:
     raise ValueError(f"unsupported type for float coercion: {type(value)!r}")
 
 
-class OrderLevel(BaseModel):
-    price: float
-    size: float
+def _lenient_float(value: Any) -> Optional[float]:
+    """Coerce like ``_coerce_float`` but map unparseable values to ``None``."""
+    try:
+        return _coerce_float(value)
+    except ValueError:
+        return None
 
-    model_config = ConfigDict(extra="ignore")
 
-    @field_validator("price", "size", mode="before")
-    @classmethod
-    def _parse_float(cls, value: Any) -> float:
-        coerced = _coerce_float(value)
-        if coerced is None:
-            raise ValueError("price/size cannot be null")
-        return coerced
+def _coerce_int(value: Any) -> int:
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(f"invalid integer value: {value}")
+    return int(value)
+
+
+def _pack_levels(raw: Any) -> np.ndarray:
+    """Pack ``[{"price": ..., "size": ...}, ...]`` into an ``(n, 2)`` float64 array."""
+    if not raw:
+        return np.empty((0, 2), dtype=np.float64)
+    try:
+        levels = np.array([(level["price"], level["size"]) for level in raw], dtype=np.float64)
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f"invalid order book level: {exc}") from exc
+    if np.isnan(levels).any():
+        raise ValueError("price/size cannot be null")
+    return levels
 
 
 class OrderBookPayload(BaseModel):
-    asks: List[OrderLevel] = Field(default_factory=list)
-    bids: List[OrderLevel] = Field(default_factory=list)
+    """Order book sides stored column-wise; only the best level is ever read."""
 
-    model_config = ConfigDict(extra="ignore")
+    asks_price: np.ndarray
+    asks_size: np.ndarray
+    bids_price: np.ndarray
+    bids_size: np.ndarray
+
+    model_config = ConfigDict(extra="ignore", arbitrary_types_allowed=True)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _pack_sides(cls, data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        asks = _pack_levels(data.get("asks"))
+        bids = _pack_levels(data.get("bids"))
+        return {
+            "asks_price": asks[:, 0],
+            "asks_size": asks[:, 1],
+            "bids_price": bids[:, 0],
+            "bids_size": bids[:, 1],
+        }
 
 
 class OrderBookMsg(BaseModel):
@@ -79,12 +114,7 @@ class MarketStatsBody(BaseModel):
     )
     @classmethod
     def _parse_optional_float(cls, value: Any) -> Optional[float]:
-        if value is None:
-            return None
-        try:
-            return _coerce_float(value)
-        except ValueError:
-            return None
+        return _lenient_float(value)
 
     @property
     def effective_funding_rate(self) -> Optional[float]:
@@ -103,6 +133,51 @@ class MarketStatsBody(BaseModel):
         )
 
 
+class MarketStatsLite(NamedTuple):
+    """Validation-free counterpart of ``MarketStatsBody`` for bulk snapshot frames."""
+
+    market_id: int
+    index_price: Optional[float] = None
+    mark_price: Optional[float] = None
+    open_interest: Optional[float] = None
+    last_trade_price: Optional[float] = None
+    current_funding_rate: Optional[float] = None
+    funding_rate: Optional[float] = None
+    daily_base_token_volume: Optional[float] = None
+    daily_quote_token_volume: Optional[float] = None
+
+    @classmethod
+    def from_raw(cls, raw: Mapping[str, Any]) -> "MarketStatsLite":
+        """Build from a raw stats dict; raises ``ValueError``/``TypeError`` on a bad ``market_id``."""
+        get = raw.get
+        return cls(
+            _coerce_int(raw["market_id"]),
+            _lenient_float(get("index_price")),
+            _lenient_float(get("mark_price")),
+            _lenient_float(get("open_interest")),
+            _lenient_float(get("last_trade_price")),
+            _lenient_float(get("current_funding_rate")),
+            _lenient_float(get("funding_rate")),
+            _lenient_float(get("daily_base_token_volume")),
+            _lenient_float(get("daily_quote_token_volume")),
+        )
+
+    @property
+    def effective_funding_rate(self) -> Optional[float]:
+        return self.current_funding_rate if self.current_funding_rate is not None else self.funding_rate
+
+    @property
+    def effective_daily_volume(self) -> Optional[float]:
+        return (
+            self.daily_quote_token_volume
+            if self.daily_quote_token_volume is not None
+            else self.daily_base_token_volume
+        )
+
+
+MarketStats = Union[MarketStatsBody, MarketStatsLite]
+
+
 class MarketStatsMsg(BaseModel):
     type: Literal["update/market_stats"]
     channel: str
@@ -111,14 +186,13 @@ class MarketStatsMsg(BaseModel):
     model_config = ConfigDict(extra="ignore")
 
 
-WsMessage = Union[OrderBookMsg, MarketStatsMsg]
+WsMessage = Annotated[Union[OrderBookMsg, MarketStatsMsg], Field(discriminator="type")]
+
+_WS_MESSAGE_ADAPTER: TypeAdapter[WsMessage] = TypeAdapter(WsMessage)
 
 
 def parse_ws_message(payload: Dict[str, Any]) -> WsMessage:
     """Parse a raw dict into the appropriate message type."""
-    msg_type = payload.get("type")
-    if msg_type == "update/order_book":
-        return OrderBookMsg.model_validate(payload)
-    if msg_type == "update/market_stats":
-        return MarketStatsMsg.model_validate(payload)
-    raise ValueError(f"unsupported message type: {msg_type!r}")
+    # The ``type`` tag picks the model inside pydantic-core; unknown types raise
+    # ValidationError, which is a ValueError.
+    return _WS_MESSAGE_ADAPTER.validate_python(payload)
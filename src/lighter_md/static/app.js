@@ -71,6 +71,7 @@ const formatters = {
 
 const statusElement = document.getElementById("status");
 const tbody = document.getElementById("markets-body");
+const decoder = new TextDecoder();
 
 const state = {
   rows: new Map(),
@@ -296,6 +297,7 @@ function connect() {
   const scheme = window.location.protocol === "https:" ? "wss" : "ws";
   const socketUrl = `${scheme}://${window.location.host}/ws`;
   const socket = new WebSocket(socketUrl);
+  socket.binaryType = "arraybuffer";
 
   socket.addEventListener("open", () => {
     state.retryDelay = 1000;
@@ -305,7 +307,9 @@ function connect() {
   socket.addEventListener("message", (event) => {
     let payload;
     try {
-      payload = JSON.parse(event.data);
+      payload = JSON.parse(
+        typeof event.data === "string" ? event.data : decoder.decode(event.data)
+      );
     } catch (_err) {
       return;
     }
@@ -316,6 +320,8 @@ function connect() {
       renderSnapshot(payload.rows);
     } else if (payload.type === "update" && payload.row) {
       applyUpdate(payload.row);
+    } else if (payload.type === "updates" && Array.isArray(payload.rows)) {
+      payload.rows.forEach(applyUpdate);
     }
   });
 
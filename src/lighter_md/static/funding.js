@@ -1,5 +1,6 @@
 const chart = document.getElementById("funding-chart");
 const timestampEl = document.getElementById("funding-updated");
+const decoder = new TextDecoder();
 
 const formatter = new Intl.NumberFormat("en-US", {
   minimumFractionDigits: 2,
@@ -111,6 +112,7 @@ function connect() {
   const scheme = window.location.protocol === "https:" ? "wss" : "ws";
   const socketUrl = `${scheme}://${window.location.host}/ws/funding`;
   const socket = new WebSocket(socketUrl);
+  socket.binaryType = "arraybuffer";
 
   socket.addEventListener("open", () => {
     retryDelay = 1000;
@@ -119,7 +121,9 @@ function connect() {
   socket.addEventListener("message", (event) => {
     let payload;
     try {
-      payload = JSON.parse(event.data);
+      payload = JSON.parse(
+        typeof event.data === "string" ? event.data : decoder.decode(event.data)
+      );
     } catch (err) {
       return;
     }
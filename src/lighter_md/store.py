@@ -3,25 +3,27 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import functools
+import heapq
 import math
 import time
+from contextlib import suppress
+from dataclasses import dataclass, field, fields, replace
 from pathlib import Path
 import re
-from typing import Dict, List, Optional, Sequence, Set, Tuple
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Set, Tuple
 
-from pydantic import BaseModel, ConfigDict
+import numpy as np
+import orjson
 
 from .bus import UpdateBus
 from .config import settings
-from .dto import MarketStatsBody, MarketStatsMsg, OrderBookMsg, OrderLevel
+from .dto import MarketStats, MarketStatsMsg, OrderBookMsg, OrderBookPayload
 
 
-def _now_ms() -> int:
-    return int(time.time() * 1000)
-
-
-class MarketRow(BaseModel):
+@dataclass(frozen=True, slots=True, kw_only=True)
+class MarketRow:
     market_id: int
     symbol: Optional[str] = None
     best_bid_price: Optional[float] = None
@@ -39,16 +41,52 @@ class MarketRow(BaseModel):
     markout: Optional[float] = None
     spread: Optional[float] = None
     updated_ms: int
+    _wire: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
 
-    model_config = ConfigDict(frozen=True)
+    @property
+    def display_symbol(self) -> str:
+        return self.symbol if self.symbol is not None else f"MKT-{self.market_id}"
 
     def for_wire(self) -> dict:
-        data = self.model_dump()
-        if data.get("symbol") is None:
-            data["symbol"] = f"MKT-{self.market_id}"
+        """Return the wire dict, built once per (immutable) row; callers must not mutate it."""
+        data = self._wire
+        if data is None:
+            data = {name: getattr(self, name) for name in _ROW_FIELDS}
+            data["symbol"] = self.display_symbol
+            object.__setattr__(self, "_wire", data)
         return data
 
 
+_ROW_FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(MarketRow) if f.init)
+
+# Fields computed from other fields; float noise there should not trigger a
+# publish. Everything else is copied from the feed and compared exactly.
+_DERIVED_FIELDS = frozenset({"mid_price", "spread", "basis", "markout"})
+
+
+@functools.lru_cache(maxsize=8)
+def _load_metadata(path: Optional[str]) -> Mapping[int, str]:
+    """Load the market id -> symbol map; cached and read-only so stores can share it."""
+    if not path:
+        return MappingProxyType({})
+    file_path = Path(path)
+    if not file_path.exists():
+        return MappingProxyType({})
+    try:
+        raw = orjson.loads(file_path.read_bytes())
+    except (orjson.JSONDecodeError, OSError):
+        return MappingProxyType({})
+    result: Dict[int, str] = {}
+    for key, value in raw.items():
+        try:
+            market_id = int(key)
+        except (ValueError, TypeError):
+            continue
+        if isinstance(value, str) and value:
+            result[market_id] = value
+    return MappingProxyType(result)
+
+
 class MarketStore:
     """Mutable in-memory store with debounced publishes."""
 
@@ -59,65 +97,48 @@ class MarketStore:
         self._debounce = max(settings.ui_debounce_seconds, 0.05)
         self._last_publish: Dict[int, float] = {}
         self._pending: Dict[int, Tuple[MarketRow, Set[str]]] = {}
-        self._flush_tasks: Dict[int, asyncio.Task] = {}
-        self._metadata = self._load_metadata(metadata_path or settings.metadata_path)
-
-    @staticmethod
-    def _load_metadata(path: Optional[str]) -> Dict[int, str]:
-        if not path:
-            return {}
-        file_path = Path(path)
-        if not file_path.exists():
-            return {}
-        try:
-            raw = json.loads(file_path.read_text())
-        except (json.JSONDecodeError, OSError):
-            return {}
-        result: Dict[int, str] = {}
-        for key, value in raw.items():
-            try:
-                market_id = int(key)
-            except (ValueError, TypeError):
-                continue
-            if isinstance(value, str) and value:
-                result[market_id] = value
-        return result
+        self._deadlines: List[Tuple[float, int]] = []
+        self._scheduled: Set[int] = set()
+        self._wake = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self._metadata = _load_metadata(metadata_path or settings.metadata_path)
 
     async def apply_market_stats(self, msg: MarketStatsMsg) -> Optional[MarketRow]:
-        stats = msg.market_stats
+        return await self.apply_stats(msg.market_stats)
+
+    async def apply_stats(self, stats: MarketStats) -> Optional[MarketRow]:
+        now = time.time()
+        now_ms = int(now * 1000)
         async with self._lock:
             row = self._rows.get(stats.market_id)
-            existing = row.model_dump() if row else self._fresh_row(stats.market_id)
-            changed_fields = self._apply_stats(existing, stats)
-            if row is None:
-                changed_fields.update(existing.keys())
-            if not changed_fields:
+            base = row or self._fresh_row(stats.market_id, now_ms)
+            changes = self._apply_stats(base, stats)
+            if row is not None and not changes:
                 return None
-            existing["updated_ms"] = _now_ms()
-            changed_fields.add("updated_ms")
-            new_row = MarketRow(**existing)
+            changes["updated_ms"] = now_ms
+            changed_fields = set(changes) if row is not None else set(_ROW_FIELDS)
+            new_row = replace(base, **changes)
             self._rows[stats.market_id] = new_row
-        await self._schedule_publish(new_row, changed_fields)
+        self._schedule_publish(new_row, changed_fields, now)
         return new_row
 
     async def apply_order_book(self, msg: OrderBookMsg) -> Optional[MarketRow]:
         market_id = self._extract_market_id(msg.channel)
         if market_id is None:
             return None
-        order_book = msg.order_book
+        now = time.time()
+        now_ms = int(now * 1000)
         async with self._lock:
             row = self._rows.get(market_id)
-            existing = row.model_dump() if row else self._fresh_row(market_id)
-            changed_fields = self._apply_order_book(existing, order_book.asks, order_book.bids)
-            if row is None:
-                changed_fields.update(existing.keys())
-            if not changed_fields:
+            base = row or self._fresh_row(market_id, now_ms)
+            changes = self._apply_order_book(base, msg.order_book)
+            if row is not None and not changes:
                 return None
-            existing["updated_ms"] = _now_ms()
-            changed_fields.add("updated_ms")
-            new_row = MarketRow(**existing)
+            changes["updated_ms"] = now_ms
+            changed_fields = set(changes) if row is not None else set(_ROW_FIELDS)
+            new_row = replace(base, **changes)
             self._rows[market_id] = new_row
-        await self._schedule_publish(new_row, changed_fields)
+        self._schedule_publish(new_row, changed_fields, now)
         return new_row
 
     async def snapshot(self) -> List[dict]:
@@ -133,48 +154,39 @@ class MarketStore:
         async with self._lock:
             return sorted(self._rows.values(), key=self._sort_key)
 
-    def _fresh_row(self, market_id: int) -> Dict[str, Optional[float]]:
-        return {
-            "market_id": market_id,
-            "symbol": self._metadata.get(market_id),
-            "best_bid_price": None,
-            "best_bid_size": None,
-            "best_ask_price": None,
-            "best_ask_size": None,
-            "last_price": None,
-            "mark_price": None,
-            "index_price": None,
-            "mid_price": None,
-            "daily_volume": None,
-            "funding_rate": None,
-            "open_interest": None,
-            "basis": None,
-            "markout": None,
-            "spread": None,
-            "updated_ms": _now_ms(),
-        }
+    def _fresh_row(self, market_id: int, now_ms: int) -> MarketRow:
+        return MarketRow(
+            market_id=market_id,
+            symbol=self._metadata.get(market_id),
+            updated_ms=now_ms,
+        )
 
     @staticmethod
-    def _apply_stats(target: Dict[str, Optional[float]], stats: MarketStatsBody) -> Set[str]:
-        changed: Set[str] = set()
-        MarketStore._update_if_not_none(target, "last_price", stats.last_trade_price, changed)
-        MarketStore._update_if_not_none(target, "mark_price", stats.mark_price, changed)
-        MarketStore._update_if_not_none(target, "index_price", stats.index_price, changed)
-        MarketStore._update_if_not_none(target, "open_interest", stats.open_interest, changed)
+    def _apply_stats(row: MarketRow, stats: MarketStats) -> Dict[str, Optional[float]]:
+        changes: Dict[str, Optional[float]] = {}
+        MarketStore._update_if_not_none(row, changes, "last_price", stats.last_trade_price)
+        MarketStore._update_if_not_none(row, changes, "mark_price", stats.mark_price)
+        MarketStore._update_if_not_none(row, changes, "index_price", stats.index_price)
+        MarketStore._update_if_not_none(row, changes, "open_interest", stats.open_interest)
         funding = stats.effective_funding_rate
-        MarketStore._update_if_not_none(target, "funding_rate", funding, changed)
+        MarketStore._update_if_not_none(row, changes, "funding_rate", funding)
         volume = stats.effective_daily_volume
-        MarketStore._update_if_not_none(target, "daily_volume", volume, changed)
-        basis = MarketStore._calc_basis(target)
-        MarketStore._assign_optional(target, "basis", basis, changed)
-        markout = MarketStore._calc_markout(target)
-        MarketStore._assign_optional(target, "markout", markout, changed)
-        return changed
+        MarketStore._update_if_not_none(row, changes, "daily_volume", volume)
+        basis = MarketStore._calc_basis(row, changes)
+        MarketStore._assign_optional(row, changes, "basis", basis)
+        markout = MarketStore._calc_markout(row, changes)
+        MarketStore._assign_optional(row, changes, "markout", markout)
+        return changes
 
     _CHANNEL_ID_RE = re.compile(r"(\d+)$")
 
     @classmethod
     def _extract_market_id(cls, channel: str) -> Optional[int]:
+        # Channels look like "order_book:7" or "order_book/7"; split the suffix off
+        # directly and only fall back to the regex for anything unusual.
+        tail = channel[max(channel.rfind(":"), channel.rfind("/")) + 1 :]
+        if tail.isascii() and tail.isdigit():
+            return int(tail)
         match = cls._CHANNEL_ID_RE.search(channel)
         if not match:
             return None
@@ -184,32 +196,20 @@ class MarketStore:
             return None
 
     @staticmethod
-    def _apply_order_book(
-        target: Dict[str, Optional[float]],
-        asks: Sequence[OrderLevel],
-        bids: Sequence[OrderLevel],
-    ) -> Set[str]:
-        changed: Set[str] = set()
-
-        def _best(side, *, reverse: bool) -> Optional[tuple[float, float]]:
-            if not side:
-                return None
-            best_level = min(side, key=lambda level: level.price) if not reverse else max(
-                side, key=lambda level: level.price
-            )
-            return best_level.price, best_level.size
+    def _apply_order_book(row: MarketRow, book: OrderBookPayload) -> Dict[str, Optional[float]]:
+        changes: Dict[str, Optional[float]] = {}
 
-        best_ask = _best(asks, reverse=False)
-        best_bid = _best(bids, reverse=True)
+        best_ask = MarketStore._best_level(book.asks_price, book.asks_size, highest=False)
+        best_bid = MarketStore._best_level(book.bids_price, book.bids_size, highest=True)
 
         def _set(field_price: str, field_size: str, value: Optional[tuple[float, float]]) -> None:
             if value is None:
-                MarketStore._assign_optional(target, field_price, None, changed)
-                MarketStore._assign_optional(target, field_size, None, changed)
+                MarketStore._assign_optional(row, changes, field_price, None)
+                MarketStore._assign_optional(row, changes, field_size, None)
                 return
             price, size = value
-            MarketStore._assign_optional(target, field_price, price, changed)
-            MarketStore._assign_optional(target, field_size, size, changed)
+            MarketStore._assign_optional(row, changes, field_price, price)
+            MarketStore._assign_optional(row, changes, field_size, size)
 
         _set("best_ask_price", "best_ask_size", best_ask)
         _set("best_bid_price", "best_bid_size", best_bid)
@@ -220,11 +220,21 @@ class MarketStore:
             absolute_spread = best_ask[0] - best_bid[0]
             if mid_price not in (None, 0):
                 spread_bps = (absolute_spread / mid_price) * 10_000
-        MarketStore._assign_optional(target, "mid_price", mid_price, changed)
-        MarketStore._assign_optional(target, "spread", spread_bps, changed)
-        markout = MarketStore._calc_markout(target)
-        MarketStore._assign_optional(target, "markout", markout, changed)
-        return changed
+        MarketStore._assign_optional(row, changes, "mid_price", mid_price)
+        MarketStore._assign_optional(row, changes, "spread", spread_bps)
+        markout = MarketStore._calc_markout(row, changes)
+        MarketStore._assign_optional(row, changes, "markout", markout)
+        return changes
+
+    @staticmethod
+    def _best_level(
+        prices: np.ndarray, sizes: np.ndarray, *, highest: bool
+    ) -> Optional[tuple[float, float]]:
+        """Return the (price, size) of the best level on one side of the book."""
+        if not len(prices):
+            return None
+        idx = prices.argmax() if highest else prices.argmin()
+        return float(prices[idx]), float(sizes[idx])
 
     @staticmethod
     def _almost_equal(left: Optional[float], right: Optional[float]) -> bool:
@@ -232,46 +242,56 @@ class MarketStore:
             return left is right
         return math.isclose(left, right, rel_tol=1e-9, abs_tol=1e-9)
 
+    @staticmethod
+    def _current(row: MarketRow, changes: Dict[str, Optional[float]], field: str) -> Optional[float]:
+        """Return ``field`` as it will be after ``changes`` are applied to ``row``."""
+        if field in changes:
+            return changes[field]
+        return getattr(row, field)
+
     @staticmethod
     def _assign_optional(
-        target: Dict[str, Optional[float]],
+        row: MarketRow,
+        changes: Dict[str, Optional[float]],
         field: str,
         value: Optional[float],
-        changed: Set[str],
     ) -> None:
-        current = target.get(field)
+        current = MarketStore._current(row, changes, field)
         if value is None:
             if current is not None:
-                target[field] = None
-                changed.add(field)
+                changes[field] = None
             return
-        if current is None or not MarketStore._almost_equal(current, value):
-            target[field] = value
-            changed.add(field)
+        if current is None:
+            changes[field] = value
+        elif field in _DERIVED_FIELDS:
+            if not MarketStore._almost_equal(current, value):
+                changes[field] = value
+        elif current != value:
+            changes[field] = value
 
     @staticmethod
     def _update_if_not_none(
-        target: Dict[str, Optional[float]],
+        row: MarketRow,
+        changes: Dict[str, Optional[float]],
         field: str,
         value: Optional[float],
-        changed: Set[str],
     ) -> None:
         if value is None:
             return
-        MarketStore._assign_optional(target, field, value, changed)
+        MarketStore._assign_optional(row, changes, field, value)
 
     @staticmethod
-    def _calc_basis(target: Dict[str, Optional[float]]) -> Optional[float]:
-        mark = target.get("mark_price")
-        index = target.get("index_price")
+    def _calc_basis(row: MarketRow, changes: Dict[str, Optional[float]]) -> Optional[float]:
+        mark = MarketStore._current(row, changes, "mark_price")
+        index = MarketStore._current(row, changes, "index_price")
         if mark is None or index is None:
             return None
         return mark - index
 
     @staticmethod
-    def _calc_markout(target: Dict[str, Optional[float]]) -> Optional[float]:
-        mid = target.get("mid_price")
-        last = target.get("last_price")
+    def _calc_markout(row: MarketRow, changes: Dict[str, Optional[float]]) -> Optional[float]:
+        mid = MarketStore._current(row, changes, "mid_price")
+        last = MarketStore._current(row, changes, "last_price")
         if mid is None or last is None:
             return None
         return mid - last
@@ -283,7 +303,7 @@ class MarketStore:
             return (1, 0, row.market_id)
         return (0, -oi, row.market_id)
 
-    async def _schedule_publish(self, row: MarketRow, fields: Set[str]) -> None:
+    def _schedule_publish(self, row: MarketRow, fields: Set[str], now: float) -> None:
         if not fields:
             return
         market_id = row.market_id
@@ -294,38 +314,67 @@ class MarketStore:
             _, existing_fields = pending
             fields |= existing_fields
         self._pending[market_id] = (row, fields)
-        now = time.time()
         last = self._last_publish.get(market_id, 0.0)
         if now - last >= self._debounce:
-            await self._emit(market_id)
+            self._emit(market_id, now)
             return
-        if market_id in self._flush_tasks:
+        if market_id in self._scheduled:
             return
-        delay = max(self._debounce - (now - last), 0.0)
-        loop = asyncio.get_running_loop()
-        task = loop.create_task(self._delayed_emit(market_id, delay))
-        self._flush_tasks[market_id] = task
-
-    async def _delayed_emit(self, market_id: int, delay: float) -> None:
-        try:
-            await asyncio.sleep(delay)
-            await self._emit(market_id)
-        except asyncio.CancelledError:
-            raise
-        finally:
-            self._flush_tasks.pop(market_id, None)
-
-    async def _emit(self, market_id: int) -> None:
+        self._scheduled.add(market_id)
+        heapq.heappush(self._deadlines, (last + self._debounce, market_id))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+        self._wake.set()
+
+    async def _flush_loop(self) -> None:
+        """Single background task emitting debounced rows as their deadlines pass."""
+        while True:
+            if not self._deadlines:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            now = time.time()
+            delay = self._deadlines[0][0] - now
+            if delay > 0:
+                self._wake.clear()
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                continue
+            batch: List[dict] = []
+            while self._deadlines and self._deadlines[0][0] <= now:
+                _, market_id = heapq.heappop(self._deadlines)
+                self._scheduled.discard(market_id)
+                update = self._take_update(market_id, now)
+                if update is not None:
+                    batch.append(update)
+            if batch:
+                self._bus.publish({"type": "updates", "rows": batch})
+
+    def _emit(self, market_id: int, now: float) -> None:
+        update = self._take_update(market_id, now)
+        if update is not None:
+            self._bus.publish({"type": "update", "row": update})
+
+    def _take_update(self, market_id: int, now: float) -> Optional[dict]:
+        """Pop the pending row for ``market_id`` and return its changed fields."""
         data = self._pending.pop(market_id, None)
         if data is None:
-            return
+            return None
         row, fields = data
-        self._last_publish[market_id] = time.time()
-        payload = row.for_wire()
-        update = {key: payload[key] for key in fields if key in payload}
-        await self._bus.publish(update)
+        self._last_publish[market_id] = now
+        # ``fields`` only ever holds row field names, so project straight from
+        # the row rather than materialising the full wire dict first.
+        update = {key: getattr(row, key) for key in fields}
+        if "symbol" in update:
+            update["symbol"] = row.display_symbol
+        return update
 
     async def close(self) -> None:
-        for task in list(self._flush_tasks.values()):
+        task = self._flusher
+        self._flusher = None
+        if task is not None:
             task.cancel()
-        self._flush_tasks.clear()
+            with suppress(asyncio.CancelledError):
+                await task
+        self._deadlines.clear()
+        self._scheduled.clear()
@@ -3,119 +3,203 @@
 from __future__ import annotations
 
 import asyncio
+import enum
 import logging
 import random
 from contextlib import suppress
-from typing import Awaitable, Callable, Iterable, Optional
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Coroutine, List, Optional, TypeVar
 
 import orjson
 import websockets
-from anyio import sleep
-from websockets.client import WebSocketClientProtocol
-from websockets.exceptions import WebSocketException
+from websockets.asyncio.client import ClientConnection
+from websockets.exceptions import ConnectionClosed, ConnectionClosedOK, WebSocketException
 
 from .config import settings
 
+T = TypeVar("T")
+
 OnMessage = Callable[[dict], Awaitable[None]]
-OnConnect = Callable[[], Awaitable[Iterable[dict]]]
+OnConnect = Callable[[ClientConnection], Awaitable[None]]
 
 
-async def run_ws_loop(
-    url: str,
-    outbound_queue: "asyncio.Queue[Optional[dict]]",
-    on_connect: OnConnect,
-    on_message: OnMessage,
-    stop_event: asyncio.Event,
-    logger: logging.Logger,
-) -> None:
-    """Run a resilient WebSocket loop with automatic reconnect and send queue."""
+# Python 3.12+ (gh-97696): run a new task inline until its first real suspension.
+_eager_task_factory = getattr(asyncio, "eager_task_factory", None)
 
-    backoff = settings.reconnect_base_delay
 
-    while not stop_event.is_set():
+def start_task(coro: Coroutine[Any, Any, T]) -> "asyncio.Task[T]":
+    """Create a task that starts eagerly where the interpreter supports it."""
+    loop = asyncio.get_running_loop()
+    if _eager_task_factory is not None:
+        return _eager_task_factory(loop, coro)
+    return loop.create_task(coro)
+
+
+@dataclass(frozen=True)
+class BatchConfig:
+    """Inbound drain policy: hand frames over after ``count`` frames or ``period`` seconds."""
+
+    count: int = settings.ws_batch_count
+    period: float = settings.ws_batch_period
+
+
+class LoopState(enum.Enum):
+    IDLE = "idle"
+    CONNECTING = "connecting"
+    RUNNING = "running"
+    BACKOFF = "backoff"
+
+
+class WSLoop:
+    """Reconnecting WebSocket driver; a backoff wait is a timer handle, not a sleeping coroutine."""
+
+    def __init__(
+        self,
+        url: str,
+        on_connect: OnConnect,
+        on_message: OnMessage,
+        stop_event: asyncio.Event,
+        logger: logging.Logger,
+        batch: BatchConfig = BatchConfig(),
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self._url = url
+        self._on_connect = on_connect
+        self._on_message = on_message
+        self._stop_event = stop_event
+        self._logger = logger
+        self._batch = batch
+        # A private generator per loop keeps jitter off the shared module-level Random.
+        self._random = (rng or random.Random()).random
+        self._backoff = settings.reconnect_base_delay
+        self._session: Optional[asyncio.Task] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.state = LoopState.IDLE
+
+    async def run(self) -> None:
+        """Connect, reconnect on failure, and return once ``stop_event`` is set."""
+        self._spawn()
+        try:
+            await self._stop_event.wait()
+        finally:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._session is not None:
+                self._session.cancel()
+                with suppress(asyncio.CancelledError):
+                    await self._session
+                self._session = None
+            self.state = LoopState.IDLE
+            self._logger.info("WS loop for %s stopped", self._url)
+
+    def _spawn(self) -> None:
+        self._timer = None
+        if self._stop_event.is_set():
+            return
+        self.state = LoopState.CONNECTING
+        self._session = start_task(self._connect())
+
+    async def _connect(self) -> None:
         try:
             async with websockets.connect(
-                url,
+                self._url,
                 ping_interval=settings.ping_interval,
                 ping_timeout=settings.ping_interval + 5,
                 close_timeout=10,
                 max_queue=None,
+                compression=settings.ws_compression,
             ) as ws:
-                logger.info("Connected to %s", url)
-                backoff = settings.reconnect_base_delay
-                await _handle_connection(ws, outbound_queue, on_connect, on_message, stop_event, logger)
-                if stop_event.is_set():
-                    break
+                self._logger.info("Connected to %s", self._url)
+                self.state = LoopState.RUNNING
+                self._backoff = settings.reconnect_base_delay
+                await _handle_connection(
+                    ws,
+                    self._on_connect,
+                    self._on_message,
+                    self._stop_event,
+                    self._logger,
+                    self._batch,
+                )
         except asyncio.CancelledError:
             raise
         except (OSError, WebSocketException) as exc:
-            logger.warning("WebSocket error: %s", exc)
+            self._logger.warning("WebSocket error: %s", exc)
         except Exception as exc:  # pragma: no cover - defensive
-            logger.exception("Unexpected WebSocket failure: %s", exc)
+            self._logger.exception("Unexpected WebSocket failure: %s", exc)
+        if not self._stop_event.is_set():
+            self.state = LoopState.BACKOFF
+            self._timer = asyncio.get_running_loop().call_later(self._next_delay(), self._spawn)
 
-        if stop_event.is_set():
-            break
-        delay = min(backoff, settings.reconnect_max_delay)
-        jitter = random.uniform(0.0, min(1.0, delay / 2))
-        await sleep(delay + jitter)
-        backoff = min(backoff * 2, settings.reconnect_max_delay)
-
-    logger.info("WS loop for %s stopped", url)
+    def _next_delay(self) -> float:
+        # Full jitter: spread reconnects uniformly over [0, backoff) so clients
+        # dropped by the same outage do not come back in lockstep.
+        cap = settings.reconnect_max_delay
+        delay = self._random() * min(self._backoff, cap)
+        self._backoff = min(self._backoff * 2, cap)
+        return delay
 
 
-async def _handle_connection(
-    ws: WebSocketClientProtocol,
-    outbound_queue: "asyncio.Queue[Optional[dict]]",
+async def run_ws_loop(
+    url: str,
     on_connect: OnConnect,
     on_message: OnMessage,
     stop_event: asyncio.Event,
     logger: logging.Logger,
+    batch: BatchConfig = BatchConfig(),
+    rng: Optional[random.Random] = None,
 ) -> None:
-    send_task = asyncio.create_task(_sender(ws, outbound_queue, stop_event, logger))
-    try:
-        initial = await on_connect()
-        for message in initial:
-            await outbound_queue.put(message)
-        async for raw in ws:
-            if stop_event.is_set():
-                break
-            try:
-                payload = orjson.loads(raw)
-            except orjson.JSONDecodeError:
-                logger.debug("Ignoring malformed JSON: %s", raw)
-                continue
-            await on_message(payload)
-    except asyncio.CancelledError:
-        raise
-    finally:
-        send_task.cancel()
-        with suppress(asyncio.CancelledError):
-            await send_task
+    """Run a resilient WebSocket loop with automatic reconnect."""
+    await WSLoop(url, on_connect, on_message, stop_event, logger, batch, rng).run()
 
 
-async def _sender(
-    ws: WebSocketClientProtocol,
-    outbound_queue: "asyncio.Queue[Optional[dict]]",
+async def _handle_connection(
+    ws: ClientConnection,
+    on_connect: OnConnect,
+    on_message: OnMessage,
     stop_event: asyncio.Event,
     logger: logging.Logger,
+    batch: BatchConfig = BatchConfig(),
 ) -> None:
+    # on_connect owns the outbound side: it keeps ``ws`` and sends on it directly.
+    await on_connect(ws)
+    while not stop_event.is_set():
+        try:
+            frames = await _recv_batch(ws, batch)
+        except ConnectionClosedOK:
+            break
+        try:
+            payloads = [orjson.loads(raw) for raw in frames]
+        except orjson.JSONDecodeError:
+            payloads = _parse_frames_lenient(frames, logger)
+        for payload in payloads:
+            await on_message(payload)
+
+
+def _parse_frames_lenient(frames: List[bytes], logger: logging.Logger) -> List[Any]:
+    """Slow path for a batch holding a malformed frame: parse one by one and skip the bad ones."""
+    payloads = []
+    for raw in frames:
+        try:
+            payloads.append(orjson.loads(raw))
+        except orjson.JSONDecodeError:
+            logger.debug("Ignoring malformed JSON: %s", raw)
+    return payloads
+
+
+async def _recv_batch(ws: ClientConnection, batch: BatchConfig) -> List[bytes]:
+    """Wait for one frame, then drain whatever else arrives within the batch window."""
+    # decode=False hands text frames over as raw UTF-8 bytes, which orjson parses directly.
+    frames = [await ws.recv(decode=False)]
+    if batch.count <= 1:
+        return frames
     try:
-        while not stop_event.is_set():
-            message = await outbound_queue.get()
-            if message is None:
-                break
-            data = orjson.dumps(message).decode("utf-8")
-            try:
-                await ws.send(data)
-            except Exception as exc:
-                logger.debug("Send failed, will retry after reconnect: %s", exc)
-                # The queue slot was consumed; put message back for the next session.
-                with suppress(asyncio.QueueFull):
-                    outbound_queue.put_nowait(message)
-                raise
-    except asyncio.CancelledError:
-        raise
-    except Exception as exc:
-        logger.debug("Sender loop exiting due to error: %s", exc)
-    finally:
-        logger.debug("Sender loop stopped")
+        async with asyncio.timeout(batch.period):
+            while len(frames) < batch.count:
+                frames.append(await ws.recv(decode=False))
+    except (TimeoutError, ConnectionClosed):
+        # recv() is cancellation-safe, and a closed connection raises again on
+        # the next call, so the frames collected so far are still delivered.
+        pass
+    return frames
+
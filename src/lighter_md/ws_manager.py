@@ -5,39 +5,57 @@ from __future__ import annotations
 import asyncio
 import logging
 from contextlib import suppress
-from typing import Optional, Set
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Type, TypeVar
 
-from pydantic import ValidationError
+import orjson
+
+from pydantic import BaseModel, ValidationError
+from websockets.asyncio.client import ClientConnection
+from websockets.exceptions import ConnectionClosed
 
 from .bus import bus as default_bus
 from .config import settings
-from .dto import MarketStatsMsg, OrderBookMsg, MarketStatsBody, parse_ws_message
+from .dto import MarketStats, MarketStatsLite, MarketStatsMsg, OrderBookMsg
 from .store import MarketStore
-from .ws_client import run_ws_loop
+from .ws_client import run_ws_loop, start_task
+
 
+M = TypeVar("M", bound=BaseModel)
 
 SUBSCRIBE_ALL = {"type": "subscribe", "channel": "market_stats/all"}
+# Subscribe frames are encoded once and sent verbatim on every (re)connect.
+SUBSCRIBE_ALL_FRAME = orjson.dumps(SUBSCRIBE_ALL)
+
+
+def _order_book_frame(market_id: int) -> bytes:
+    return orjson.dumps({"type": "subscribe", "channel": f"order_book/{market_id}"})
 
 
 class WebSocketManager:
     """Coordinates the WS client, store, and subscriptions."""
 
-    def __init__(self, store: MarketStore, outbound_queue: Optional[asyncio.Queue] = None) -> None:
+    def __init__(self, store: MarketStore) -> None:
         self._store = store
-        self._outbound: asyncio.Queue = outbound_queue or asyncio.Queue(maxsize=1024)
+        self._ws: Optional[ClientConnection] = None
+        self._send_lock = asyncio.Lock()
         self._stop_event = asyncio.Event()
         self._task: Optional[asyncio.Task] = None
-        self._known_markets: Set[int] = set()
+        # Both are kept in discovery order so reconnects replay the frames as-is.
+        self._known_markets: Dict[int, None] = {}
+        self._subscribe_frames: List[bytes] = [SUBSCRIBE_ALL_FRAME]
         self._logger = logging.getLogger("lighter_md.ws")
+        self._dispatch: Dict[str, Callable[[dict], Awaitable[None]]] = {
+            "update/market_stats": self._dispatch_market_stats,
+            "update/order_book": self._dispatch_order_book,
+        }
 
     async def start(self) -> None:
         if self._task and not self._task.done():
             return
         self._stop_event.clear()
-        self._task = asyncio.create_task(
+        self._task = start_task(
             run_ws_loop(
                 settings.ws_url,
-                self._outbound,
                 self._on_connect,
                 self._on_message,
                 self._stop_event,
@@ -47,73 +65,94 @@ class WebSocketManager:
 
     async def stop(self) -> None:
         self._stop_event.set()
-        with suppress(asyncio.QueueFull):
-            self._outbound.put_nowait(None)
         if self._task:
             self._task.cancel()
             with suppress(asyncio.CancelledError):
                 await self._task
             self._task = None
-        with suppress(asyncio.QueueEmpty):
-            while True:
-                self._outbound.get_nowait()
+        self._ws = None
         await self._store.close()
 
     def is_running(self) -> bool:
         return self._task is not None and not self._task.done()
 
-    async def _on_connect(self):
-        self._logger.info("Subscribing to %s markets", len(self._known_markets) + 1)
-        messages = [{"type": "subscribe", "channel": "market_stats/all"}]
-        messages.extend({"type": "subscribe", "channel": f"order_book/{mid}"} for mid in sorted(self._known_markets))
-        return messages
+    async def _on_connect(self, ws: ClientConnection) -> None:
+        self._ws = ws
+        self._logger.info("Subscribing to %s markets", len(self._subscribe_frames))
+        await self._send(self._subscribe_frames)
 
     async def _on_message(self, payload: dict) -> None:
-        if payload.get("type") == "update/market_stats":
-            raw_stats = payload.get("market_stats")
-            if isinstance(raw_stats, dict) and "market_id" not in raw_stats:
-                await self._handle_market_stats_batch(payload.get("channel"), raw_stats)
-                return
+        handler = self._dispatch.get(payload.get("type"))
+        if handler is None:
+            self._logger.debug("Dropping unhandled message: %s", payload)
+            return
+        await handler(payload)
+
+    async def _dispatch_market_stats(self, payload: dict) -> None:
+        raw_stats = payload.get("market_stats")
+        if isinstance(raw_stats, dict) and "market_id" not in raw_stats:
+            await self._handle_market_stats_batch(raw_stats)
+            return
+        message = self._validate(MarketStatsMsg, payload)
+        if message is not None:
+            await self._handle_market_stats(message.market_stats)
+
+    async def _dispatch_order_book(self, payload: dict) -> None:
+        message = self._validate(OrderBookMsg, payload)
+        if message is not None:
+            await self._handle_order_book(message)
+
+    def _validate(self, model: Type[M], payload: dict) -> Optional[M]:
         try:
-            message = parse_ws_message(payload)
+            return model.model_validate(payload)
         except (ValidationError, ValueError) as exc:
             self._logger.debug("Dropping invalid message: %s (%s)", payload, exc)
-            return
-        if isinstance(message, MarketStatsMsg):
-            await self._handle_market_stats(message)
-        elif isinstance(message, OrderBookMsg):
-            await self._handle_order_book(message)
+            return None
 
-    async def _handle_market_stats(self, message: MarketStatsMsg) -> None:
-        market_id = message.market_stats.market_id
+    async def _handle_market_stats(self, stats: MarketStats) -> None:
+        market_id = stats.market_id
         new_market = market_id not in self._known_markets
-        await self._store.apply_market_stats(message)
+        await self._store.apply_stats(stats)
         if new_market:
-            self._known_markets.add(market_id)
-            await self._enqueue({"type": "subscribe", "channel": f"order_book/{market_id}"})
+            self._known_markets[market_id] = None
+            frame = _order_book_frame(market_id)
+            self._subscribe_frames.append(frame)
+            await self._send((frame,))
             self._logger.info("Discovered market %s", market_id)
 
     async def _handle_order_book(self, message: OrderBookMsg) -> None:
         await self._store.apply_order_book(message)
 
-    async def _enqueue(self, message: dict) -> None:
-        await self._outbound.put(message)
+    async def _send(self, frames: Iterable[bytes]) -> None:
+        ws = self._ws
+        if ws is None:
+            return
+        try:
+            async with self._send_lock:
+                for frame in frames:
+                    # Frames are UTF-8 JSON bytes; text=True sends them as text frames
+                    # without a decode/encode round trip.
+                    await ws.send(frame, text=True)
+        except ConnectionClosed as exc:
+            # Nothing to replay: _on_connect resubscribes every known market.
+            self._logger.debug("Send failed, will resubscribe after reconnect: %s", exc)
 
     @property
     def store(self) -> MarketStore:
         return self._store
 
-    async def _handle_market_stats_batch(self, channel: Optional[str], batch: dict) -> None:
+    async def _handle_market_stats_batch(self, batch: dict) -> None:
+        # Snapshot frames carry every market at once, so entries skip pydantic and
+        # are read straight into MarketStatsLite with the same lenient float rules.
         for value in batch.values():
             if not isinstance(value, dict) or "market_id" not in value:
                 continue
             try:
-                stats = MarketStatsBody.model_validate(value)
-            except ValidationError as exc:
+                stats = MarketStatsLite.from_raw(value)
+            except (TypeError, ValueError) as exc:
                 self._logger.debug("Skipping invalid market stats entry %s: %s", value, exc)
                 continue
-            message = MarketStatsMsg(type="update/market_stats", channel=channel or "market_stats:all", market_stats=stats)
-            await self._handle_market_stats(message)
+            await self._handle_market_stats(stats)
 
 
 def build_manager(bus=default_bus) -> WebSocketManager:
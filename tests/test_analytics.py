@@ -1,6 +1,7 @@
 import asyncio
 import math
 
+import orjson
 import pytest
 
 from lighter_md.analytics import compute_cross_sectional_zscores, FundingAnalytics
@@ -36,11 +37,24 @@ def test_compute_cross_sectional_zscores_basic():
         make_row(2, funding_rate=0.02),
         make_row(3, funding_rate=0.03),
     ]
-    zscores = compute_cross_sectional_zscores(rows, min_assets_per_time=3, ddof=0)
-    assert set(zscores.keys()) == {1, 2, 3}
-    assert zscores[2] == pytest.approx(0.0)
-    assert zscores[1] == pytest.approx(-math.sqrt(1.5))
-    assert zscores[3] == pytest.approx(math.sqrt(1.5))
+    market_ids, zscores = compute_cross_sectional_zscores(rows, min_assets_per_time=3, ddof=0)
+    assert market_ids.tolist() == [1, 2, 3]
+    assert zscores[1] == pytest.approx(0.0)
+    assert zscores[0] == pytest.approx(-math.sqrt(1.5))
+    assert zscores[2] == pytest.approx(math.sqrt(1.5))
+
+
+def test_compute_cross_sectional_zscores_missing_funding_is_nan():
+    rows = [
+        make_row(1, funding_rate=0.01),
+        make_row(2, funding_rate=None),
+        make_row(3, funding_rate=0.03),
+    ]
+    market_ids, zscores = compute_cross_sectional_zscores(rows, min_assets_per_time=2, ddof=0)
+    assert market_ids.tolist() == [1, 2, 3]
+    assert math.isnan(zscores[1])
+    assert zscores[0] == pytest.approx(-1.0)
+    assert zscores[2] == pytest.approx(1.0)
 
 
 def test_compute_cross_sectional_zscores_insufficient_assets():
@@ -48,15 +62,16 @@ def test_compute_cross_sectional_zscores_insufficient_assets():
         make_row(1, funding_rate=0.01),
         make_row(2, funding_rate=None),
     ]
-    zscores = compute_cross_sectional_zscores(rows, min_assets_per_time=3, ddof=0)
-    assert all(value is None for value in zscores.values())
+    market_ids, zscores = compute_cross_sectional_zscores(rows, min_assets_per_time=3, ddof=0)
+    assert market_ids.tolist() == [1, 2]
+    assert all(math.isnan(value) for value in zscores)
 
 
 class StubBus:
     def __init__(self) -> None:
         self.events = []
 
-    async def publish(self, message):
+    def publish(self, message):
         self.events.append(message)
 
 
@@ -89,7 +104,26 @@ def test_funding_analytics_computes_snapshot(event_loop):
 
     assert analytics.latest is not None
     assert bus.events
-    payload = bus.events[-1]
+    payload = orjson.loads(bus.events[-1])
     assert payload["type"] == "snapshot"
     symbols = [row["symbol"] for row in payload["rows"]]
     assert symbols[0] == "MKT-3"  # highest funding → highest z-score
+
+
+def test_funding_analytics_top_n_keeps_highest_scores(event_loop):
+    rows = [
+        make_row(1, funding_rate=0.01, open_interest=100),
+        make_row(2, funding_rate=0.03, open_interest=50),
+        make_row(3, funding_rate=0.03, open_interest=150),
+        make_row(4, funding_rate=0.02, open_interest=10),
+        make_row(5, funding_rate=None, open_interest=500),
+    ]
+    bus = StubBus()
+    analytics = FundingAnalytics(
+        StubStore(rows), publish_bus=bus, interval_seconds=0.1, min_assets=2, top_n=2
+    )
+
+    event_loop.run_until_complete(analytics._compute_and_publish())
+
+    market_ids = [row["market_id"] for row in analytics.latest.rows]
+    assert market_ids == [3, 2]
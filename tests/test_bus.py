@@ -0,0 +1,36 @@
+import asyncio
+
+import orjson
+import pytest
+
+from lighter_md.bus import UpdateBus
+
+
+@pytest.fixture
+def event_loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_publish_encodes_once_for_all_subscribers(event_loop):
+    bus = UpdateBus()
+
+    async def scenario():
+        first = bus.subscribe()
+        second = bus.subscribe()
+        # Prime both generators so their queues are registered before publishing.
+        first_next = asyncio.ensure_future(first.__anext__())
+        second_next = asyncio.ensure_future(second.__anext__())
+        await asyncio.sleep(0)
+        bus.publish({"type": "update", "row": {"market_id": 1, "mid_price": 1.5}})
+        received = await asyncio.gather(first_next, second_next)
+        await bus.close()
+        leftovers = [item async for item in first] + [item async for item in second]
+        return received, leftovers
+
+    received, leftovers = event_loop.run_until_complete(scenario())
+
+    assert received[0] is received[1]
+    assert orjson.loads(received[0]) == {"type": "update", "row": {"market_id": 1, "mid_price": 1.5}}
+    assert leftovers == []
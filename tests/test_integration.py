@@ -1,15 +1,35 @@
 import asyncio
+
+import orjson
 import pytest
 
 from lighter_md.store import MarketStore
-from lighter_md.ws_manager import WebSocketManager
+from websockets.exceptions import ConnectionClosedError
+
+from lighter_md.ws_manager import SUBSCRIBE_ALL_FRAME, WebSocketManager
+
+
+class RecordingWebSocket:
+    def __init__(self, closed: bool = False) -> None:
+        self.closed = closed
+        self.sent = []
+        self.text_flags = set()
+
+    async def send(self, data, text=None) -> None:
+        if self.closed:
+            raise ConnectionClosedError(None, None)
+        self.sent.append(data)
+        self.text_flags.add(text)
+
+    def channels(self):
+        return [orjson.loads(frame)["channel"] for frame in self.sent]
 
 
 class RecordingBus:
     def __init__(self) -> None:
         self.events = []
 
-    async def publish(self, message):
+    def publish(self, message):
         self.events.append(message)
 
 
@@ -20,12 +40,14 @@ def event_loop():
     loop.close()
 
 
-def test_manager_discovers_market_and_enqueues_subscription(event_loop):
+def test_manager_discovers_market_and_sends_subscription(event_loop):
     bus = RecordingBus()
-    outbound = asyncio.Queue()
+    ws = RecordingWebSocket()
     store = MarketStore(bus)
     store._debounce = 0  # type: ignore[attr-defined]
-    manager = WebSocketManager(store, outbound_queue=outbound)
+    manager = WebSocketManager(store)
+    event_loop.run_until_complete(manager._on_connect(ws))
+    assert ws.sent == [SUBSCRIBE_ALL_FRAME]
 
     stats_payload = {
         "type": "update/market_stats",
@@ -38,11 +60,10 @@ def test_manager_discovers_market_and_enqueues_subscription(event_loop):
     }
     event_loop.run_until_complete(manager._on_message(stats_payload))
 
-    subscribe_message = event_loop.run_until_complete(asyncio.wait_for(outbound.get(), 0.1))
-    assert subscribe_message["channel"] == "order_book/7"
+    assert ws.channels() == ["market_stats/all", "order_book/7"]
 
     assert bus.events, "store should emit snapshot for new market"
-    snapshot_event = bus.events[-1]
+    snapshot_event = bus.events[-1]["row"]
     assert snapshot_event["market_id"] == 7
     assert pytest.approx(snapshot_event["funding_rate"]) == 0.01
 
@@ -55,14 +76,47 @@ def test_manager_discovers_market_and_enqueues_subscription(event_loop):
         },
     }
     event_loop.run_until_complete(manager._on_message(order_payload))
-    order_event = bus.events[-1]
+    order_event = bus.events[-1]["row"]
     expected_mid = (51 + 49.5) / 2
     expected_spread_bps = ((51 - 49.5) / expected_mid) * 10_000
     assert pytest.approx(order_event["mid_price"]) == pytest.approx(expected_mid)
     assert pytest.approx(order_event["spread"]) == pytest.approx(expected_spread_bps)
     assert pytest.approx(order_event["markout"]) == pytest.approx(expected_mid - 50.5)
 
-    reconnect_messages = event_loop.run_until_complete(manager._on_connect())
-    assert any(msg["channel"] == "order_book/7" for msg in reconnect_messages)
+    # A market discovered while the connection is down is picked up on reconnect.
+    manager._ws = RecordingWebSocket(closed=True)
+    stats_payload["market_stats"] = {"market_id": 3, "last_trade_price": "10"}
+    event_loop.run_until_complete(manager._on_message(stats_payload))
+
+    reconnected = RecordingWebSocket()
+    event_loop.run_until_complete(manager._on_connect(reconnected))
+    assert reconnected.channels() == ["market_stats/all", "order_book/7", "order_book/3"]
+    assert reconnected.text_flags == {True}
+
+    event_loop.run_until_complete(store.close())
+
+
+def test_manager_skips_invalid_entries_in_market_stats_batch(event_loop):
+    bus = RecordingBus()
+    ws = RecordingWebSocket()
+    store = MarketStore(bus)
+    store._debounce = 0  # type: ignore[attr-defined]
+    manager = WebSocketManager(store)
+    manager._ws = ws
+
+    batch_payload = {
+        "type": "update/market_stats",
+        "channel": "market_stats:all",
+        "market_stats": {
+            "1": {"market_id": 1, "last_trade_price": "10"},
+            "2": {"market_id": "not-a-number", "last_trade_price": "20"},
+            "3": {"market_id": 3, "last_trade_price": "30"},
+        },
+    }
+    event_loop.run_until_complete(manager._on_message(batch_payload))
+
+    rows = event_loop.run_until_complete(store.snapshot())
+    assert sorted(row["market_id"] for row in rows) == [1, 3]
+    assert ws.channels() == ["order_book/1", "order_book/3"]
 
     event_loop.run_until_complete(store.close())
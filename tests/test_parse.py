@@ -1,6 +1,6 @@
 import pytest
 
-from lighter_md.dto import OrderBookMsg, parse_ws_message, MarketStatsMsg
+from lighter_md.dto import MarketStatsBody, MarketStatsLite, OrderBookMsg, parse_ws_message, MarketStatsMsg
 
 
 def test_parse_market_stats_message():
@@ -39,10 +39,39 @@ def test_parse_order_book_message():
     }
     message = parse_ws_message(payload)
     assert isinstance(message, OrderBookMsg)
-    assert message.order_book.asks[0].price == pytest.approx(3338.80)
-    assert message.order_book.bids[0].size == pytest.approx(29.0915)
+    assert message.order_book.asks_price[0] == pytest.approx(3338.80)
+    assert message.order_book.bids_size[0] == pytest.approx(29.0915)
+
+
+def test_parse_order_book_rejects_null_levels():
+    payload = {
+        "type": "update/order_book",
+        "channel": "order_book:42",
+        "order_book": {"asks": [{"price": None, "size": "1"}], "bids": []},
+    }
+    with pytest.raises(ValueError):
+        parse_ws_message(payload)
 
 
 def test_parse_invalid_message_type():
     with pytest.raises(ValueError):
         parse_ws_message({"type": "unknown", "channel": "noop"})
+
+
+def test_market_stats_lite_matches_validated_body():
+    raw = {
+        "market_id": "5",
+        "index_price": "10.5",
+        "mark_price": "bogus",
+        "open_interest": None,
+        "funding_rate": 0.001,
+        "daily_base_token_volume": " 12 ",
+    }
+    lite = MarketStatsLite.from_raw(raw)
+    body = MarketStatsBody.model_validate(raw)
+    assert lite == tuple(body.model_dump().values())
+    assert lite.effective_funding_rate == body.effective_funding_rate
+    assert lite.effective_daily_volume == body.effective_daily_volume
+
+    with pytest.raises(ValueError):
+        MarketStatsLite.from_raw({"market_id": "abc"})
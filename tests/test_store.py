@@ -9,7 +9,7 @@ class StubBus:
     def __init__(self) -> None:
         self.events = []
 
-    async def publish(self, message):
+    def publish(self, message):
         self.events.append(message)
 
 
@@ -44,7 +44,7 @@ def test_market_stats_prefer_quote_volume_and_current_funding(event_loop):
     event_loop.run_until_complete(store.apply_market_stats(msg))
 
     assert bus.events, "expected publish event"
-    event = bus.events[-1]
+    event = bus.events[-1]["row"]
     assert event["market_id"] == 1
     assert pytest.approx(event["daily_volume"]) == 98765.4
     assert pytest.approx(event["funding_rate"]) == 0.0042
@@ -83,7 +83,7 @@ def test_order_book_updates_top_of_book_and_spread(event_loop):
     event_loop.run_until_complete(store.apply_order_book(msg))
 
     assert bus.events, "order book update should publish"
-    event = bus.events[-1]
+    event = bus.events[-1]["row"]
     assert pytest.approx(event["best_ask_price"]) == 110.5
     assert pytest.approx(event["best_bid_price"]) == 109.2
     expected_mid = (110.5 + 109.2) / 2
@@ -116,3 +116,35 @@ def test_redundant_updates_do_not_publish(event_loop):
     assert len(bus.events) == first_count
 
     event_loop.run_until_complete(store.close())
+
+
+def test_debounced_updates_are_flushed_after_window(event_loop):
+    bus = StubBus()
+    store = MarketStore(bus)
+    store._debounce = 0.05  # type: ignore[attr-defined]
+
+    def stats(price: str) -> MarketStatsMsg:
+        return MarketStatsMsg.model_validate(
+            {
+                "type": "update/market_stats",
+                "channel": "market_stats:3",
+                "market_stats": {"market_id": 3, "last_trade_price": price},
+            }
+        )
+
+    async def scenario() -> None:
+        await store.apply_market_stats(stats("1.0"))
+        await store.apply_market_stats(stats("2.0"))
+        await store.apply_market_stats(stats("3.0"))
+        assert len(bus.events) == 1
+        await asyncio.sleep(0.15)
+
+    event_loop.run_until_complete(scenario())
+
+    assert len(bus.events) == 2
+    batch = bus.events[-1]
+    assert batch["type"] == "updates"
+    assert [row["market_id"] for row in batch["rows"]] == [3]
+    assert batch["rows"][0]["last_price"] == pytest.approx(3.0)
+
+    event_loop.run_until_complete(store.close())
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+
+import pytest
+from websockets.exceptions import ConnectionClosedOK
+
+from lighter_md import ws_client
+from lighter_md.config import settings
+from lighter_md.ws_client import BatchConfig, WSLoop, _handle_connection, run_ws_loop
+
+
+class FakeWebSocket:
+    def __init__(self, frames) -> None:
+        self._frames: asyncio.Queue = asyncio.Queue()
+        for frame in frames:
+            self._frames.put_nowait(frame)
+
+    async def recv(self, decode=None):
+        frame = await self._frames.get()
+        if frame is None:
+            raise ConnectionClosedOK(None, None)
+        return frame if decode is None else frame.encode()
+
+
+@pytest.fixture
+def event_loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_handle_connection_drains_batches_and_skips_bad_json(event_loop):
+    received = []
+
+    connected = []
+
+    async def on_connect(ws):
+        connected.append(ws)
+
+    async def on_message(payload):
+        received.append(payload)
+
+    async def scenario():
+        ws = FakeWebSocket(['{"seq": 1}', "not json", '{"seq": 2}', '{"seq": 3}', None])
+        await _handle_connection(
+            ws,
+            on_connect,
+            on_message,
+            asyncio.Event(),
+            logging.getLogger("test"),
+            BatchConfig(count=2, period=0.01),
+        )
+
+    event_loop.run_until_complete(scenario())
+
+    assert len(connected) == 1
+    assert received == [{"seq": 1}, {"seq": 2}, {"seq": 3}]
+
+
+class HalfRng:
+    def random(self) -> float:
+        return 0.5
+
+
+def test_ws_loop_uses_full_jitter_backoff():
+    loop = WSLoop("ws://test", None, None, asyncio.Event(), logging.getLogger("test"), rng=HalfRng())
+
+    delays = [loop._next_delay() for _ in range(8)]
+
+    base, cap = settings.reconnect_base_delay, settings.reconnect_max_delay
+    expected = [0.5 * min(base * 2**attempt, cap) for attempt in range(8)]
+    assert delays == pytest.approx(expected)
+
+
+class ZeroRng:
+    def random(self) -> float:
+        return 0.0
+
+
+def test_run_ws_loop_reconnects_on_timer_until_stopped(event_loop, monkeypatch):
+    attempts = []
+    stop_event = asyncio.Event()
+
+    def failing_connect(*args, **kwargs):
+        attempts.append(args[0])
+        if len(attempts) == 3:
+            stop_event.set()
+        raise OSError("connection refused")
+
+    monkeypatch.setattr(ws_client.websockets, "connect", failing_connect)
+
+    event_loop.run_until_complete(
+        asyncio.wait_for(
+            run_ws_loop(
+                "ws://test",
+                None,
+                None,
+                stop_event,
+                logging.getLogger("test"),
+                rng=ZeroRng(),
+            ),
+            1.0,
+        )
+    )
+
+    assert attempts == ["ws://test"] * 3
+